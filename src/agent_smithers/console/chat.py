@@ -1,16 +1,133 @@
+import asyncio
+import functools
+import json
 import os
+import re
+from collections import deque
 
 import anthropic
+import httpx
 from rich.console import Console
 from rich.prompt import Prompt
 
+try:  # HTTP/2 multiplexing helps back-to-back tool iterations, if available
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 from agent_smithers.env import ANTHROPIC_API_KEY
-from agent_smithers.printer import print_assistant, print_system, print_user
+from agent_smithers.printer import (
+    print_assistant,
+    print_system,
+    print_system_batch,
+    print_user,
+)
 from agent_smithers.tools import definitions, executor
 
 
+# Opt-in beta header required for cache_control content blocks
+_PROMPT_CACHING_HEADERS = {"anthropic-beta": "prompt-caching-2024-07-31"}
+
+# Individual strings inside a tool result are capped at this many characters
+_TOOL_RESULT_STRING_LIMIT = 2000
+
+# Hard bound on retained conversation messages
+_MAX_CONVERSATION_MESSAGES = 200
+
+# Once the API history grows past this, the oldest exchange is folded into
+# the rolling summary instead of being resent every turn
+_SUMMARY_FOLD_THRESHOLD = 40
+
+_SUMMARY_MODEL = "claude-3-5-haiku-20241022"
+
+_MAX_RATE_LIMIT_RETRIES = 3
+
+_EXIT_COMMANDS = frozenset(("exit", "quit"))
+_MAX_EXIT_COMMAND_LEN = max(map(len, _EXIT_COMMANDS))
+
+# A numbered-list item like "1. ..." or "2) ..." at the start of a line
+_NUMBERED_ITEM_RE = re.compile(r"^\s*\d+[.)]\s+", re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str) -> anthropic.AsyncAnthropic:
+    """Return a shared AsyncAnthropic client for this API key.
+
+    Sessions created with the same key reuse one httpx connection pool, so
+    concurrent sessions don't each pay their own TLS handshakes.
+    """
+    return anthropic.AsyncAnthropic(
+        api_key=api_key,
+        max_retries=2,
+        # The SDK's client subclass keeps its default timeouts while letting
+        # us widen the connection pool and enable HTTP/2 multiplexing
+        http_client=anthropic.DefaultAsyncHttpxClient(
+            http2=_HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=16),
+        ),
+    )
+
+
+def _split_batchable(user_input: str) -> list[str]:
+    """Split pasted input into independent questions when it is a numbered list.
+
+    Returns the questions if the input is batchable, otherwise the input as a
+    single-element list. Answering them in one request amortizes the shared
+    conversation prefix across every question instead of paying it per turn.
+    """
+    if not _NUMBERED_ITEM_RE.match(user_input):
+        return [user_input]
+    questions = [
+        part.strip() for part in _NUMBERED_ITEM_RE.split(user_input) if part.strip()
+    ]
+    if len(questions) < 2:
+        return [user_input]
+    return questions
+
+
+def _truncate_strings(obj, limit: int = _TOOL_RESULT_STRING_LIMIT):
+    """Recursively cap string fields in a tool result, marking what was cut."""
+    if isinstance(obj, str):
+        if len(obj) > limit:
+            return obj[:limit] + f"…[truncated {len(obj) - limit} chars]"
+        return obj
+    if isinstance(obj, dict):
+        return {key: _truncate_strings(value, limit) for key, value in obj.items()}
+    if isinstance(obj, list | tuple):
+        return [_truncate_strings(value, limit) for value in obj]
+    return obj
+
+
+def _serialize_tool_response(tool_response) -> str:
+    """Render a tool response as compact JSON rather than a Python repr.
+
+    str() on a list of dicts produces a quote-heavy repr that tokenizes
+    poorly; compact JSON is both smaller and easier for the model to parse.
+    """
+    return json.dumps(
+        _truncate_strings(tool_response),
+        default=str,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+
+
 class ChatSession:
-    def __init__(self, api_key: str | None = None):
+    __slots__ = (
+        "_api_messages",
+        "_log_buffer",
+        "_prompt",
+        "_rolling_summary",
+        "api_key",
+        "client",
+        "console",
+        "conversation",
+        "enable_prompt_caching",
+    )
+
+    def __init__(self, api_key: str | None = None, enable_prompt_caching: bool = True):
         self.api_key = (
             api_key or ANTHROPIC_API_KEY or os.environ.get("ANTHROPIC_API_KEY")
         )
@@ -18,34 +135,295 @@ class ChatSession:
             raise ValueError(
                 "ANTHROPIC_API_KEY must be provided either as an argument or environment variable"
             )
-        self.client = anthropic.Client(api_key=self.api_key)
+        self.client = _get_client(self.api_key)
         self.console = Console()
-        self.conversation = []
+        self.conversation: deque = deque(maxlen=_MAX_CONVERSATION_MESSAGES)
+        # Conversation mirrored in Anthropic API format, appended to at turn
+        # end so each turn reuses it instead of rebuilding the full history
+        self._api_messages: list[dict] = []
+        # Plain-text summary of exchanges folded out of _api_messages
+        self._rolling_summary = ""
+        # Built once; Prompt.ask rebuilds its style tree on every call
+        self._prompt = Prompt("\n[bold green]You[/]", console=self.console)
+        # Tool activity is buffered here and flushed after the tool loop so
+        # console writes don't interleave with response streaming
+        self._log_buffer: list[str] = []
+        self.enable_prompt_caching = enable_prompt_caching
+
+    def _tools_for_request(self) -> list:
+        """Return the tool definitions, with a cache breakpoint on the last one.
+
+        The tool list is identical every turn, so marking its tail lets the API
+        serve the tokenized prefix from cache instead of re-tokenizing it.
+        """
+        if not self.enable_prompt_caching:
+            return definitions
+        tools = [dict(definition) for definition in definitions]
+        tools[-1] = {**tools[-1], "cache_control": {"type": "ephemeral"}}
+        return tools
+
+    def _mark_cache_breakpoint(self, api_messages: list) -> list:
+        """Attach cache_control to the last stable message before the new turn."""
+        if not self.enable_prompt_caching or len(api_messages) < 2:
+            return api_messages
+
+        marked = list(api_messages)
+        index = len(marked) - 2
+        message = marked[index]
+        if not isinstance(message, dict):
+            return marked
+
+        content = message.get("content")
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        elif isinstance(content, list):
+            content = list(content)
+        else:
+            return marked
+
+        if content and isinstance(content[-1], dict):
+            content[-1] = {**content[-1], "cache_control": {"type": "ephemeral"}}
+            marked[index] = {**message, "content": content}
+        return marked
+
+    @staticmethod
+    def _block_field(block, field: str):
+        """Read a field from a content block that may be a dict or an SDK object."""
+        if isinstance(block, dict):
+            return block.get(field)
+        return getattr(block, field, None)
+
+    @classmethod
+    def _content_to_display_text(cls, content) -> str:
+        """Flatten message content (a string or block list) to plain text."""
+        if isinstance(content, str):
+            return content
+        return "".join(
+            cls._block_field(block, "text") or ""
+            for block in content
+            if cls._block_field(block, "type") == "text"
+        )
+
+    def _compress_tool_results(self, api_messages: list, keep_last: int = 2) -> list:
+        """Build a copy of api_messages with old tool results collapsed to summaries.
+
+        Tool results grow the prompt quadratically over a tool-heavy session, so
+        all but the last `keep_last` tool_result messages have their block
+        content replaced by a one-line summary. The blocks themselves (and
+        their tool_use_id pairing with the preceding assistant message) are
+        preserved, since the API rejects a tool_use without a matching
+        tool_result. The originals stay in `self.conversation` untouched.
+        """
+        # Map tool_use_id -> tool name so summaries can name the tool
+        tool_names = {}
+        for message in api_messages:
+            content = message.get("content") if isinstance(message, dict) else None
+            if not isinstance(content, list):
+                continue
+            for block in content:
+                if self._block_field(block, "type") == "tool_use":
+                    tool_names[self._block_field(block, "id")] = self._block_field(
+                        block, "name"
+                    )
+
+        # Indices of messages carrying tool_result blocks, oldest first
+        result_indices = [
+            i
+            for i, message in enumerate(api_messages)
+            if isinstance(message, dict)
+            and isinstance(message.get("content"), list)
+            and any(
+                self._block_field(block, "type") == "tool_result"
+                for block in message["content"]
+            )
+        ]
+
+        to_compress = set(result_indices[:-keep_last] if keep_last else result_indices)
+        if not to_compress:
+            return list(api_messages)
+
+        compressed = []
+        for i, message in enumerate(api_messages):
+            if i not in to_compress:
+                compressed.append(message)
+                continue
+            blocks = []
+            for block in message["content"]:
+                if self._block_field(block, "type") != "tool_result":
+                    blocks.append(block)
+                    continue
+                tool_use_id = self._block_field(block, "tool_use_id")
+                raw = str(self._block_field(block, "content"))
+                tool_name = tool_names.get(tool_use_id, "tool")
+                blocks.append(
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": tool_use_id,
+                        "content": f"[{tool_name}] OK ({len(raw)} chars) | {raw[:80]}",
+                    }
+                )
+            compressed.append({"role": message["role"], "content": blocks})
+        return compressed
+
+    def _print_batch_answers(self, questions: list[str], final_message) -> None:
+        """Render one answer per question when a batched turn returns JSON.
+
+        The streamed echo is suppressed for batched turns, so if the model
+        didn't return a parseable JSON array the raw text is shown instead —
+        either way each answer appears exactly once.
+        """
+        text = self._content_to_display_text(final_message)
+        try:
+            answers = json.loads(text)
+        except ValueError:
+            answers = None
+        if not isinstance(answers, list):
+            print_assistant(text)
+            return
+        for question, answer in zip(questions, answers, strict=False):
+            print_assistant(f"{question}\n{answer}")
+
+    def _system_prompt(self):
+        """Return the rolling-summary system prompt, if any has accrued."""
+        if not self._rolling_summary:
+            return anthropic.NOT_GIVEN
+        return f"Summary of earlier conversation:\n{self._rolling_summary}"
+
+    async def _fold_oldest_exchange(self) -> None:
+        """Fold the oldest exchange into the rolling summary once history grows.
+
+        Runs at most one cheap summarization call per overflow, not per turn;
+        if the call fails, fall back to appending the raw exchange truncated.
+        """
+        if len(self._api_messages) <= _SUMMARY_FOLD_THRESHOLD:
+            return
+
+        oldest = [self._api_messages.pop(0), self._api_messages.pop(0)]
+        transcript = "\n".join(
+            f"{message['role']}: {self._content_to_display_text(message['content'])}"
+            for message in oldest
+        )
+        try:
+            response = await self.client.messages.create(
+                model=_SUMMARY_MODEL,
+                max_tokens=256,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": (
+                            "Update this running conversation summary with the "
+                            "new exchange. Reply with the updated summary only.\n\n"
+                            f"Current summary:\n{self._rolling_summary or '(empty)'}\n\n"
+                            f"New exchange:\n{transcript}"
+                        ),
+                    }
+                ],
+            )
+            self._rolling_summary = "".join(
+                content.text for content in response.content if content.type == "text"
+            ).strip()
+        except Exception:
+            self._rolling_summary = f"{self._rolling_summary}\n{transcript}"[-2000:]
+
+    async def _stream_turn(self, messages: list, keep_last: int = 2, echo: bool = True):
+        """Send one request, streaming text to the console as it arrives.
+
+        Pass echo=False to drain the stream silently (batched turns render
+        through _print_batch_answers instead, so the raw JSON array would
+        otherwise appear twice).
+
+        Returns:
+            The final message once the stream completes.
+        """
+        async with self.client.messages.stream(
+            model="claude-3-opus-20240229",
+            max_tokens=1024,
+            system=self._system_prompt(),
+            messages=self._mark_cache_breakpoint(
+                self._compress_tool_results(messages, keep_last=keep_last)
+            ),
+            tools=self._tools_for_request(),
+            extra_headers=_PROMPT_CACHING_HEADERS
+            if self.enable_prompt_caching
+            else None,
+        ) as stream:
+            async for text in stream.text_stream:
+                if echo:
+                    self.console.print(text, end="")
+            response = await stream.get_final_message()
+        if echo:
+            self.console.print()
+        return response
+
+    async def _call_with_recovery(self, messages: list, echo: bool = True):
+        """Send a turn, recovering from rate limits and oversized prompts.
+
+        Rate limits back off and retry the same turn instead of discarding
+        it; a context-length rejection triggers a harder compression pass
+        (no tool results kept verbatim) and one more attempt.
+        """
+        for attempt in range(_MAX_RATE_LIMIT_RETRIES):
+            try:
+                return await self._stream_turn(messages, echo=echo)
+            except anthropic.RateLimitError:
+                if attempt == _MAX_RATE_LIMIT_RETRIES - 1:
+                    raise
+                delay = min(2**attempt, 30)
+                print_system(f"Rate limited; retrying in {delay}s")
+                await asyncio.sleep(delay)
+            except anthropic.APIStatusError as e:
+                oversized = e.status_code == 413 or "context_length" in str(
+                    e
+                ) or "prompt is too long" in str(e)
+                if not oversized:
+                    raise
+                print_system("Prompt too large; compressing tool results and retrying")
+                return await self._stream_turn(messages, keep_last=0, echo=echo)
+        return None
 
     def chat_loop(self):
+        asyncio.run(self.chat_loop_async())
+
+    async def chat_loop_async(self):
         print_system("Starting chat with Agent Smithers (powered by Anthropic Claude)")
         print_system("Type 'exit' or 'quit' to end the conversation")
 
         while True:
-            user_input = Prompt.ask("\n[bold green]You[/]")
+            # The prompt blocks on stdin, so keep it off the event loop
+            user_input = await asyncio.to_thread(self._prompt)
 
-            if user_input.lower() in ("exit", "quit"):
+            # Length check first so pasted multi-KB prompts skip the
+            # lowercased-copy allocation entirely
+            if (
+                len(user_input) <= _MAX_EXIT_COMMAND_LEN
+                and user_input.lower() in _EXIT_COMMANDS
+            ):
                 print_system("Ending chat session")
                 break
 
             print_user(user_input)
 
+            # A pasted numbered list becomes one batched request instead of
+            # one round-trip per question
+            batch_questions = _split_batchable(user_input)
+            if len(batch_questions) > 1:
+                request_text = (
+                    "Answer each numbered question below. Return a JSON array "
+                    "of strings, one answer per question.\n\n"
+                    + "\n".join(
+                        f"{i}. {question}"
+                        for i, question in enumerate(batch_questions, 1)
+                    )
+                )
+            else:
+                request_text = user_input
+
             try:
-                # Create initial message
+                # Shallow copy so the tool loop can splice in tool_result
+                # messages without touching the persistent history
                 messages = [
-                    *[
-                        {
-                            "role": "user" if msg["role"] == "user" else "assistant",
-                            "content": msg["content"],
-                        }
-                        for msg in self.conversation
-                    ],
-                    {"role": "user", "content": user_input},
+                    *self._api_messages,
+                    {"role": "user", "content": request_text},
                 ]
 
                 # Process tool calls until Claude no longer needs to use tools
@@ -53,11 +431,8 @@ class ChatSession:
                 final_assistant_message = None
 
                 while tool_calls_remain:
-                    response = self.client.messages.create(
-                        model="claude-3-opus-20240229",
-                        max_tokens=1024,
-                        messages=messages,
-                        tools=definitions,
+                    response = await self._call_with_recovery(
+                        messages, echo=len(batch_questions) == 1
                     )
 
                     # Check if the response contains tool calls
@@ -67,18 +442,18 @@ class ChatSession:
                     for content in response.content:
                         if content.type == "tool_use":
                             has_tool_use = True
-                            print_system(
+                            self._log_buffer.append(
                                 f"Using tool: {content.name} with params {content.input}"
                             )
                             tool_response = executor(content)
-                            print_system(f"Tool response: {tool_response}")
+                            self._log_buffer.append(f"Tool response: {tool_response}")
 
                             # Add tool result to send back
                             tool_results.append(
                                 {
                                     "type": "tool_result",
                                     "tool_use_id": content.id,
-                                    "content": str(tool_response),
+                                    "content": _serialize_tool_response(tool_response),
                                 }
                             )
 
@@ -94,25 +469,36 @@ class ChatSession:
                         final_assistant_message = response.content
                         break
 
-                # Extract the text response after all tools have been used
-                assistant_response = "".join(
-                    [
-                        content.text
-                        for content in final_assistant_message
-                        if content.type == "text"
-                    ]
-                )
-                print_assistant(assistant_response)
+                print_system_batch(self._log_buffer)
+                self._log_buffer.clear()
+
+                if len(batch_questions) > 1:
+                    self._print_batch_answers(
+                        batch_questions, final_assistant_message
+                    )
 
+                # Store the raw content blocks: resending them unchanged next
+                # turn keeps the prefix byte-identical for prompt caching and
+                # avoids the block -> string -> block round trip. The text was
+                # already rendered incrementally by the stream above.
                 self.conversation.extend(
                     [
                         {"role": "user", "content": user_input},
-                        {"role": "assistant", "content": assistant_response},
+                        {"role": "assistant", "content": final_assistant_message},
+                    ]
+                )
+                self._api_messages.extend(
+                    [
+                        {"role": "user", "content": request_text},
+                        {"role": "assistant", "content": final_assistant_message},
                     ]
                 )
+                await self._fold_oldest_exchange()
 
             except Exception as e:
-                print_system(f"Error: {e!s}")
+                print_system_batch(self._log_buffer)
+                self._log_buffer.clear()
+                print_system(f"Error ({type(e).__name__}): {e!s}")
 
 
 def start_chat_session(api_key: str | None = None):
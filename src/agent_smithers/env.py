@@ -3,7 +3,17 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 
-env_path = Path(__file__).parents[2] / ".env"
-load_dotenv(env_path)
+_ENV_PATH = Path(__file__).parents[2] / ".env"
+
+# Only hit the filesystem when the environment isn't already configured;
+# this module is imported on every CLI start and test-worker spawn
+if not (
+    os.environ.get("ANTHROPIC_API_KEY")
+    and os.environ.get("GITHUB_TOKEN")
+    and os.environ.get("GITHUB_ORGANIZATION")
+):
+    load_dotenv(_ENV_PATH, override=False)
+
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+GITHUB_ORGANIZATION = os.getenv("GITHUB_ORGANIZATION")
@@ -1,19 +1,52 @@
 """GitHub API client implementation."""
 
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 from agent_smithers.env import GITHUB_TOKEN
 from github import Auth, Github, Repository
+from urllib3.util.retry import Retry
+
+# Code search results are served from cache for this long before re-querying
+_SEARCH_CACHE_TTL_SECONDS = 300
+_SEARCH_CACHE_MAX_ENTRIES = 256
+
+# Retry transient GitHub errors with backoff instead of surfacing them
+_DEFAULT_RETRIES = 3
+_RETRY_BACKOFF_FACTOR = 0.3
+_RETRY_STATUS_FORCELIST = [500, 502, 503, 504]
+
+# Keep-alive pool sized for the parallel blob fetches plus search traffic
+_DEFAULT_POOL_SIZE = 32
+
+# Decoded blobs kept per client; blob SHAs are immutable so entries never
+# go stale, only cold
+_BLOB_CACHE_MAX_ENTRIES = 512
 
 
 class GitHubClientConfig:
     """Configuration for the GitHub client."""
 
-    def __init__(self, organization: str):
+    def __init__(
+        self,
+        organization: str,
+        pool_size: int = _DEFAULT_POOL_SIZE,
+        retries: int = _DEFAULT_RETRIES,
+    ):
         """Initialize the GitHub client configuration.
 
         Args:
             organization: The GitHub organization name to scope operations to.
+            pool_size: Size of the shared keep-alive connection pool, so all
+                API calls reuse established TLS connections.
+            retries: How many times to retry transient server errors.
         """
         self.organization = organization
+        self.pool_size = pool_size
+        self.retries = retries
 
 
 class GitHubClient:
@@ -25,9 +58,48 @@ class GitHubClient:
         Args:
             config: The client configuration containing organization settings.
         """
-        self._client = Github(auth=Auth.Token(GITHUB_TOKEN))
+        self._client = Github(
+            auth=Auth.Token(GITHUB_TOKEN),
+            retry=Retry(
+                total=config.retries,
+                backoff_factor=_RETRY_BACKOFF_FACTOR,
+                status_forcelist=_RETRY_STATUS_FORCELIST,
+            ),
+            pool_size=config.pool_size,
+        )
         self._organization = self._client.get_organization(config.organization)
         self._org_name = config.organization
+        self._repo_cache: dict[str, Repository.Repository] = {}
+        self._code_search_cache: OrderedDict[
+            tuple[str, str], tuple[float, list[dict]]
+        ] = OrderedDict()
+        # Reused across calls so blob fetches don't pay thread startup costs
+        self._blob_pool = ThreadPoolExecutor(
+            max_workers=5, thread_name_prefix="github-blob"
+        )
+        self._blob_cache: OrderedDict[str, str | None] = OrderedDict()
+        self._blob_cache_lock = threading.Lock()
+
+    def _decode_content(self, code) -> str | None:
+        """Fetch and decode a code result's blob content, cached by blob SHA.
+
+        Agents often re-search overlapping code across turns; a hit skips the
+        blob round-trip and both decode passes.
+        """
+        sha = code.sha
+        with self._blob_cache_lock:
+            if sha in self._blob_cache:
+                self._blob_cache.move_to_end(sha)
+                return self._blob_cache[sha]
+
+        content = code.decoded_content
+        text = content.decode("utf-8") if content else None
+
+        with self._blob_cache_lock:
+            self._blob_cache[sha] = text
+            if len(self._blob_cache) > _BLOB_CACHE_MAX_ENTRIES:
+                self._blob_cache.popitem(last=False)
+        return text
 
     def get_repository(self, name: str) -> Repository.Repository:
         """Get a repository within the organization by its name.
@@ -38,7 +110,11 @@ class GitHubClient:
         Returns:
             The repository object.
         """
-        return self._organization.get_repo(name)
+        repo = self._repo_cache.get(name)
+        if repo is None:
+            repo = self._organization.get_repo(name)
+            self._repo_cache[name] = repo
+        return repo
 
     def search_repositories(self, query: str) -> list[Repository.Repository]:
         """Search for repositories matching a query within the organization.
@@ -62,6 +138,17 @@ class GitHubClient:
         Returns:
             A list of matching code snippets with metadata
         """
+        key = (repository, query)
+        cached = self._code_search_cache.get(key)
+        if cached is not None:
+            cached_at, cached_results = cached
+            if time.monotonic() - cached_at < _SEARCH_CACHE_TTL_SECONDS:
+                # Agents often repeat the same query within a session; skip
+                # the search round-trip and the per-blob fetch/decode work
+                self._code_search_cache.move_to_end(key)
+                return list(cached_results)
+            del self._code_search_cache[key]
+
         if "/" in repository:
             full_repo_name = repository
         else:
@@ -69,23 +156,52 @@ class GitHubClient:
         qualified_query = f"{query} repo:{full_repo_name}"
         code_results = self._client.search_code(qualified_query)
 
+        # Truncate before decoding: each decoded_content access fetches the
+        # blob over HTTPS, so only pay for the top 5 results we return
+        top_results = list(itertools.islice(code_results, 5))
+        # The five blob fetches are independent HTTPS GETs, so run them in
+        # parallel and pay max(RTT) rather than sum(RTT)
+        contents = list(self._blob_pool.map(self._decode_content, top_results))
         results = [
             {
                 "repository": code.repository.full_name,
                 "path": code.path,
                 "url": code.html_url,
-                "content": code.decoded_content.decode("utf-8")
-                if code.decoded_content
-                else None,
+                "content": content,
             }
-            for code in code_results
+            for code, content in zip(top_results, contents, strict=True)
         ]
-        return results[:5]  # Limit to top 5 results
 
-    def list_accessible_repositories(self) -> list[Repository.Repository]:
-        """List all repositories accessible within the organization.
+        self._code_search_cache[key] = (time.monotonic(), results)
+        if len(self._code_search_cache) > _SEARCH_CACHE_MAX_ENTRIES:
+            self._code_search_cache.popitem(last=False)
+        return list(results)
+
+    def list_accessible_repositories(
+        self, limit: int | None = 50
+    ) -> list[Repository.Repository]:
+        """List repositories accessible within the organization.
+
+        PyGithub paginates at 30 repos per request, so bounding the listing
+        avoids walking the whole organization when only the top few are
+        needed.
+
+        Args:
+            limit: Maximum number of repositories to return, most recently
+                updated first. Pass None to list everything.
 
         Returns:
             A list of accessible repositories.
         """
-        return list(self._organization.get_repos(sort="updated"))
+        repos = self._organization.get_repos(sort="updated")
+        if limit is None:
+            return list(repos)
+        return list(itertools.islice(repos, limit))
+
+    def iter_accessible_repositories(self):
+        """Iterate accessible repositories lazily, page by page.
+
+        Returns:
+            The paginated repository listing, most recently updated first.
+        """
+        return self._organization.get_repos(sort="updated")
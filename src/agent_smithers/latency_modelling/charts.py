@@ -69,10 +69,20 @@ def create_latency_plot(
     return fig
 
 
-def create_queue_dynamics_plot(df: pd.DataFrame, figsize=(12, 12)) -> plt.Figure:
-    """Plot queue dynamics over time"""
+def create_queue_dynamics_plot(
+    df: pd.DataFrame, figsize=(12, 12), fig: plt.Figure | None = None
+) -> plt.Figure:
+    """Plot queue dynamics over time
+
+    Pass an existing figure via `fig` to clear and redraw into it,
+    skipping figure/axes construction on repeat plots.
+    """
     # Create three subplots
-    fig, (ax1, ax3, ax4) = plt.subplots(3, 1, figsize=figsize, sharex=True)
+    if fig is None:
+        fig, (ax1, ax3, ax4) = plt.subplots(3, 1, figsize=figsize, sharex=True)
+    else:
+        fig.clear()
+        ax1, ax3, ax4 = fig.subplots(3, 1, sharex=True)
     ax2 = ax1.twinx()  # Create twin axis for queue length
 
     # Set style
@@ -159,5 +169,5 @@ def create_queue_dynamics_plot(df: pd.DataFrame, figsize=(12, 12)) -> plt.Figure
     ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper right")
     ax2.get_legend().remove()  # Remove duplicate legend
 
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
@@ -0,0 +1,117 @@
+"""Closed-form Erlang-C latency model for a Celery worker pool."""
+
+import functools
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@functools.lru_cache(maxsize=None)
+def _factorial(n: int) -> int:
+    """Memoized factorial; parameter sweeps reuse the same worker counts."""
+    return math.factorial(n)
+
+
+@dataclass(frozen=True)
+class CeleryLatencyModel:
+    """Erlang-C (M/M/c) queueing model of a Celery worker pool.
+
+    All derived metrics are lazy cached properties, so the dependency chain
+    (p0 -> queue length -> waiting time -> total time) is evaluated exactly
+    once per model instance even when several metrics are read.
+
+    Attributes:
+        num_workers: Number of concurrent workers (c).
+        arrival_rate: Message arrival rate in messages per second (lambda).
+        service_time: Mean seconds to process one message (1 / mu).
+    """
+
+    num_workers: int
+    arrival_rate: float
+    service_time: float
+
+    @functools.cached_property
+    def offered_load(self) -> float:
+        """Offered load lambda / mu in erlangs."""
+        return self.arrival_rate * self.service_time
+
+    @functools.cached_property
+    def utilization(self) -> float:
+        """Per-worker utilization rho; must be < 1 for a stable queue."""
+        return self.offered_load / self.num_workers
+
+    @functools.cached_property
+    def _p0(self) -> float:
+        """Probability that the system is empty."""
+        c = self.num_workers
+        load = self.offered_load
+        sum_term = sum(load**n / _factorial(n) for n in range(c))
+        last_term = load**c / (_factorial(c) * (1 - self.utilization))
+        return 1.0 / (sum_term + last_term)
+
+    @functools.cached_property
+    def average_queue_length(self) -> float:
+        """Mean number of messages waiting in the queue (Lq)."""
+        c = self.num_workers
+        load = self.offered_load
+        rho = self.utilization
+        return (self._p0 * load**c * rho) / (_factorial(c) * (1 - rho) ** 2)
+
+    @functools.cached_property
+    def average_waiting_time(self) -> float:
+        """Mean seconds a message waits before service starts (Wq)."""
+        return self.average_queue_length / self.arrival_rate
+
+    @functools.cached_property
+    def average_total_time(self) -> float:
+        """Mean seconds from arrival to completion (W)."""
+        return self.average_waiting_time + self.service_time
+
+    @classmethod
+    def vector_metrics(
+        cls,
+        num_workers: int,
+        arrival_rates: np.ndarray,
+        service_time: float,
+    ) -> pd.DataFrame:
+        """Evaluate the model over an array of arrival rates in one pass.
+
+        Sweeps for charts evaluate thousands of points; broadcasting the
+        whole Erlang-C computation over a float64 array keeps the work in
+        NumPy instead of building one model instance per sample.
+
+        Args:
+            num_workers: Number of concurrent workers, fixed for the sweep.
+            arrival_rates: Arrival rates in messages per second.
+            service_time: Mean seconds to process one message.
+
+        Returns:
+            A DataFrame with one row per arrival rate and columns for
+            utilization, p0, average queue length, waiting time and total
+            time.
+        """
+        c = num_workers
+        rates = np.asarray(arrival_rates, dtype=np.float64)
+        fact = np.array([_factorial(n) for n in range(c + 1)], dtype=np.float64)
+
+        load = rates * service_time
+        rho = load / c
+        sum_term = np.sum(load[:, None] ** np.arange(c) / fact[:c], axis=1)
+        last_term = load**c / (fact[c] * (1 - rho))
+        p0 = 1.0 / (sum_term + last_term)
+        queue_length = (p0 * load**c * rho) / (fact[c] * (1 - rho) ** 2)
+        waiting_time = queue_length / rates
+        total_time = waiting_time + service_time
+
+        return pd.DataFrame(
+            {
+                "arrival_rate": rates,
+                "utilization": rho,
+                "p0": p0,
+                "average_queue_length": queue_length,
+                "average_waiting_time": waiting_time,
+                "average_total_time": total_time,
+            }
+        )
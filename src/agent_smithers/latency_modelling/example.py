@@ -1,4 +1,5 @@
-import matplotlib.pyplot as plt
+import argparse
+
 import numpy as np
 import pandas as pd
 
@@ -17,18 +18,23 @@ def generate_message_traffic(duration_seconds: int = 3600) -> pd.Series:
         freq="s",
     )
 
-    # Generate message counts for first half
-    base_count = np.round(
-        10 + 5 * np.sin(2 * np.pi * np.arange(duration_seconds) / 3600)
+    # Generate message counts for first half: float32 sinusoid rounded
+    # straight to int32, so no float64 intermediate buffer is materialized
+    base_count = (
+        (10 + 5 * np.sin(2 * np.pi * np.arange(duration_seconds, dtype=np.float32) / 3600))
+        .round()
+        .astype(np.int32)
     )
-    random_variation = np.random.randint(-2, 3, duration_seconds)  # -2 to +2 messages
-    message_counts = np.maximum(base_count + random_variation, 0).astype(int)
+    random_variation = np.random.randint(
+        -2, 3, duration_seconds, dtype=np.int32
+    )  # -2 to +2 messages
+    message_counts = np.maximum(base_count + random_variation, 0)
 
     # Add silent period
-    silent_period = np.zeros(duration_seconds, dtype=int)
+    silent_period = np.zeros(duration_seconds, dtype=np.int32)
 
     # Combine active and silent periods
-    full_traffic = np.concatenate([message_counts, silent_period])
+    full_traffic = np.concatenate((message_counts, silent_period))
 
     return pd.Series(full_traffic, index=index, name="messages_per_second")
 
@@ -59,14 +65,15 @@ def generate_spiky_traffic(
     # Create base traffic
     traffic = np.full(duration_seconds, base_rate, dtype=int)
 
-    # Add spikes
-    for spike_start in range(0, duration_seconds, spike_interval):
-        if spike_start + spike_duration > duration_seconds:
-            break
-
-        # Create spike with random variation
-        spike = np.random.randint(spike_rate - 5, spike_rate + 5, spike_duration)
-        traffic[spike_start : spike_start + spike_duration] = spike
+    # Scatter all spikes in one vectorized pass: spike indices come from
+    # broadcasting start positions against within-spike offsets, and all
+    # random values are drawn in a single call
+    starts = np.arange(0, duration_seconds - spike_duration + 1, spike_interval)
+    if starts.size:
+        indices = (starts[:, None] + np.arange(spike_duration)[None, :]).ravel()
+        traffic[indices] = np.random.randint(
+            spike_rate - 5, spike_rate + 5, size=indices.size
+        )
 
     # Add silent period
     silent_period = np.zeros(duration_seconds, dtype=int)
@@ -76,15 +83,44 @@ def generate_spiky_traffic(
 
 
 class WorkerScaling:
+    # Queue-length thresholds and the worker counts they map to
+    HIGH_THRESHOLD = 50
+    MID_THRESHOLD = 10
+    HIGH_WORKERS = 45
+    MID_WORKERS = 30
+    LOW_WORKERS = 10
+
     def __init__(self, startup_delay: int = 20):
         self.startup_delay = startup_delay
         self.scale_up_time = None  # When we started scaling up
-        self.target_workers = 10  # Initial worker count
-        self.current_workers = 10  # Current active workers
+        self.target_workers = self.LOW_WORKERS  # Initial worker count
+        self.current_workers = self.LOW_WORKERS  # Current active workers
+
+    def kernel_params(self) -> tuple[int, int, int, int, int, int]:
+        """Expose the policy as scalars for the compiled simulation kernel.
+
+        The whole policy is a pure function of queue length and elapsed
+        seconds, so the kernel can inline it instead of calling back into
+        Python once per tick.
+        """
+        return (
+            self.HIGH_THRESHOLD,
+            self.MID_THRESHOLD,
+            self.HIGH_WORKERS,
+            self.MID_WORKERS,
+            self.LOW_WORKERS,
+            self.startup_delay,
+        )
 
     def __call__(self, queue_length: int, seconds: int) -> int:
         # Determine target worker count based on queue length
-        new_target = 45 if queue_length >= 50 else 30 if queue_length >= 10 else 10
+        new_target = (
+            self.HIGH_WORKERS
+            if queue_length >= self.HIGH_THRESHOLD
+            else self.MID_WORKERS
+            if queue_length >= self.MID_THRESHOLD
+            else self.LOW_WORKERS
+        )
 
         # If target has changed, record the time
         if new_target > self.target_workers:
@@ -109,6 +145,14 @@ class WorkerScaling:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the example Celery simulation")
+    parser.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="Skip plotting (avoids importing matplotlib entirely)",
+    )
+    args = parser.parse_args()
+
     # Generate 4 minutes of spiky traffic (2 min active, 2 min silent)
     message_traffic = generate_spiky_traffic(
         duration_seconds=120,
@@ -129,8 +173,11 @@ def main():
     simulation.run()
 
     # Plot queue dynamics
-    simulation.plot_queue_dynamics()
-    plt.show()
+    if not args.no_plot:
+        import matplotlib.pyplot as plt
+
+        simulation.plot_queue_dynamics()
+        plt.show()
 
 
 if __name__ == "__main__":
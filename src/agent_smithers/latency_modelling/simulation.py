@@ -1,11 +1,9 @@
-from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass
-from datetime import datetime
+from typing import TYPE_CHECKING
 
-import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
-from rich.console import Console
 from rich.progress import (
     BarColumn,
     Progress,
@@ -14,7 +12,124 @@ from rich.progress import (
     TimeElapsedColumn,
 )
 
-from agent_smithers.latency_modelling.charts import create_queue_dynamics_plot
+from agent_smithers.printer import console
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+try:
+    from numba import njit
+
+    _NUMBA_AVAILABLE = True
+except ImportError:  # Numba is optional; the plain Python loop still works
+    _NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+@njit(cache=True)
+def _simulate_kernel(  # noqa: PLR0913
+    arrivals: np.ndarray,
+    service_time: int,
+    initial_workers: int,
+    high_threshold: int,
+    mid_threshold: int,
+    high_workers: int,
+    mid_workers: int,
+    low_workers: int,
+    startup_delay: int,
+    in_queue_out: np.ndarray,
+    in_progress_out: np.ndarray,
+    completed_out: np.ndarray,
+    min_wait_out: np.ndarray,
+    mean_wait_out: np.ndarray,
+    max_wait_out: np.ndarray,
+    utilization_out: np.ndarray,
+    num_workers_out: np.ndarray,
+) -> int:
+    """Per-tick queueing core as pure integer/float array arithmetic.
+
+    Mirrors the Python loop in ``CelerySimulation.run`` with the
+    threshold-with-startup-delay scaling policy inlined, so Numba can
+    compile the whole feedback loop without calling back into Python.
+    Queued messages are arrival *ticks* in a ring buffer; waits are tick
+    subtractions because ticks are one second apart.
+    """
+    duration = arrivals.shape[0]
+    queue_ticks = np.empty(int(arrivals.sum()) + 1, dtype=np.int64)
+    head = 0
+    tail = 0
+    in_prog = 0
+    current_workers = initial_workers
+    target_workers = initial_workers
+    scale_up_time = -1
+    message_counter = 0
+
+    for i in range(duration):
+        queue_length = tail - head
+
+        # Threshold scaling with delayed scale-up, immediate scale-down
+        if queue_length >= high_threshold:
+            new_target = high_workers
+        elif queue_length >= mid_threshold:
+            new_target = mid_workers
+        else:
+            new_target = low_workers
+        if new_target > target_workers:
+            if scale_up_time < 0:
+                scale_up_time = i
+            target_workers = new_target
+        elif new_target < target_workers:
+            target_workers = new_target
+            current_workers = new_target
+            scale_up_time = -1
+        if scale_up_time >= 0 and i >= scale_up_time + startup_delay:
+            current_workers = target_workers
+            scale_up_time = -1
+
+        completions = 0
+        if i > 0:
+            completions = in_prog // service_time
+            in_prog -= completions
+
+        new_arrivals = int(arrivals[i])
+        message_counter += new_arrivals
+
+        available_capacity = current_workers - in_prog
+        dispatched = min(max(available_capacity, 0), tail - head)
+        head += dispatched
+        in_prog += dispatched
+        available_capacity -= dispatched
+
+        direct = min(max(available_capacity, 0), new_arrivals)
+        in_prog += direct
+        queued = new_arrivals - direct
+        if queued:
+            queue_ticks[tail : tail + queued] = i
+            tail += queued
+
+        queue_length = tail - head
+        if queue_length > 0:
+            waits = i - queue_ticks[head:tail]
+            min_wait_out[i] = waits.min()
+            mean_wait_out[i] = waits.mean()
+            max_wait_out[i] = waits.max()
+        else:
+            min_wait_out[i] = 0
+            mean_wait_out[i] = 0
+            max_wait_out[i] = 0
+
+        in_queue_out[i] = queue_length
+        in_progress_out[i] = in_prog
+        completed_out[i] = completions
+        num_workers_out[i] = current_workers
+        utilization_out[i] = in_prog / current_workers
+
+    return message_counter
 
 
 @dataclass
@@ -28,28 +143,32 @@ class SimulationParams:
     log_interval: int = 60  # Log detailed metrics every N seconds
 
 
-@dataclass
-class Message:
-    id: int
-    arrival_time: datetime
-    queue_position: int = 0  # Track position in queue
-
-    def wait_time(self, current_time: datetime) -> float:
-        """Calculate how long this message has been waiting"""
-        return (current_time - self.arrival_time).total_seconds()
-
-
 class CelerySimulation:
     def __init__(self, params: SimulationParams, arrival_rate: pd.Series):
         self.params = params
         self.arrival_rate = arrival_rate
         self._validate_inputs()
-        self.df = self._initialize_dataframe()
+        self._initialize_arrays()
+        # Assembled lazily from the output arrays via the `df` property
+        self._df: pd.DataFrame | None = None
         self.message_counter = 0
-        self.message_queue = deque[Message]()  # Queue of Message objects
-        self.in_progress: list[Message] = []  # List of currently processing messages
-        self.console = Console()
-        self.queue_position = 0  # Track overall queue position
+        self.total_completed = 0
+        # SoA message queue: parallel arrays of arrival epoch-seconds and
+        # message ids with head/tail cursors. Dequeuing advances the head
+        # instead of popping per-message objects, and wait-time statistics
+        # become one vectorized subtraction over the live slice.
+        # The tail only ever advances, so total arrivals bounds it exactly
+        # and one upfront allocation covers the whole run
+        self._queue_capacity = int(self.arrivals.sum()) + 1
+        self.queue_arrivals = np.empty(self._queue_capacity, dtype=np.int64)
+        self.queue_ids = np.empty(self._queue_capacity, dtype=np.int64)
+        self.queue_head = 0
+        self.queue_tail = 0
+        self.in_progress_count = 0  # Messages currently being processed
+        self.log_events: list[tuple] = []  # Raw events, formatted after the run
+        # Shared singleton: Console() construction probes the terminal, and
+        # one console per simulation object buys nothing
+        self.console = console
         self.current_workers = params.initial_workers
 
     def _validate_inputs(self):
@@ -58,35 +177,79 @@ class CelerySimulation:
                 f"Arrival rate series must have {self.params.duration} entries"
             )
 
-    def _initialize_dataframe(self) -> pd.DataFrame:
-        """Initialize the simulation DataFrame"""
-        df = pd.DataFrame(
+    def _initialize_arrays(self) -> None:
+        """Preallocate per-tick input and output arrays for the hot loop.
+
+        Scalar df.iloc reads and df.at writes go through pandas' indexer
+        machinery on every tick; plain ndarray element access does not.
+        """
+        duration = self.params.duration
+        # The traffic generators already carry a per-second DatetimeIndex;
+        # reuse it rather than paying for a second date_range build
+        if isinstance(self.arrival_rate.index, pd.DatetimeIndex):
+            self.timestamps = self.arrival_rate.index
+        else:
+            self.timestamps = pd.date_range(
+                start="2024-01-01", periods=duration, freq="s"
+            )
+        self.arrivals = self.arrival_rate.to_numpy().astype(np.int64)
+        # Epoch seconds per tick, so wait times are integer subtractions
+        # instead of datetime arithmetic
+        self.timestamps_epoch = self.timestamps.astype("datetime64[s]").view(np.int64)
+        # Counts and waits are integer seconds that comfortably fit int32,
+        # and float32 has far more precision than utilization or a mean
+        # wait needs — half the bytes, better cache locality downstream
+        self.in_queue_arr = np.zeros(duration, dtype=np.int32)
+        self.in_progress_arr = np.zeros(duration, dtype=np.int32)
+        self.completed_arr = np.zeros(duration, dtype=np.int32)
+        self.min_wait_arr = np.zeros(duration, dtype=np.int32)
+        self.mean_wait_arr = np.zeros(duration, dtype=np.float32)
+        self.max_wait_arr = np.zeros(duration, dtype=np.int32)
+        self.utilization_arr = np.zeros(duration, dtype=np.float32)
+        self.num_workers_arr = np.full(
+            duration, self.params.initial_workers, dtype=np.int32
+        )
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Results DataFrame, built on first access from the output arrays.
+
+        The hot loop only ever touches the NumPy arrays; the DataFrame is
+        purely a presentation view for summaries and plotting.
+        """
+        if self._df is None:
+            self._df = self._build_dataframe()
+        return self._df
+
+    def _build_dataframe(self) -> pd.DataFrame:
+        """Assemble the results DataFrame from the output arrays in one pass."""
+        return pd.DataFrame(
             {
-                "timestamp": pd.date_range(
-                    start="2024-01-01", periods=self.params.duration, freq="s"
-                ),
-                "arrivals": self.arrival_rate.to_numpy(),
-                "in_queue": 0,
-                "in_progress": 0,
-                "completed": 0,
-                "min_wait_time": 0.0,
-                "mean_wait_time": 0.0,
-                "max_wait_time": 0.0,
-                "utilization": 0.0,
-                "num_workers": self.params.initial_workers,
+                "timestamp": self.timestamps,
+                "arrivals": self.arrivals,
+                "in_queue": self.in_queue_arr,
+                "in_progress": self.in_progress_arr,
+                "completed": self.completed_arr,
+                "min_wait_time": self.min_wait_arr,
+                "mean_wait_time": self.mean_wait_arr,
+                "max_wait_time": self.max_wait_arr,
+                "utilization": self.utilization_arr,
+                "num_workers": self.num_workers_arr,
             }
         )
-        return df
-
-    def _create_message(self, current_time: datetime) -> Message:
-        """Create a new message with unique ID and queue position"""
-        self.message_counter += 1
-        self.queue_position += 1
-        return Message(
-            id=self.message_counter,
-            arrival_time=current_time,
-            queue_position=self.queue_position,
-        )
+
+    def _ensure_queue_capacity(self, needed: int) -> None:
+        """Grow the queue arrays (amortized doubling) to hold `needed` entries."""
+        if needed <= self._queue_capacity:
+            return
+        while self._queue_capacity < needed:
+            self._queue_capacity *= 2
+        grown_arrivals = np.empty(self._queue_capacity, dtype=np.int64)
+        grown_arrivals[: self.queue_tail] = self.queue_arrivals[: self.queue_tail]
+        self.queue_arrivals = grown_arrivals
+        grown_ids = np.empty(self._queue_capacity, dtype=np.int64)
+        grown_ids[: self.queue_tail] = self.queue_ids[: self.queue_tail]
+        self.queue_ids = grown_ids
 
     def _update_worker_count(self, queue_length: int, seconds_elapsed: int) -> None:
         """Update number of workers based on scaling function"""
@@ -94,8 +257,74 @@ class CelerySimulation:
             queue_length, seconds_elapsed
         )
 
+    def _run_compiled(self, scaling_params: tuple[int, ...]) -> pd.DataFrame:
+        """Run the whole simulation inside the Numba kernel, then replay logs."""
+        (
+            high_threshold,
+            mid_threshold,
+            high_workers,
+            mid_workers,
+            low_workers,
+            startup_delay,
+        ) = scaling_params
+        self.message_counter = _simulate_kernel(
+            self.arrivals,
+            self.params.service_time,
+            self.params.initial_workers,
+            high_threshold,
+            mid_threshold,
+            high_workers,
+            mid_workers,
+            low_workers,
+            startup_delay,
+            self.in_queue_arr,
+            self.in_progress_arr,
+            self.completed_arr,
+            self.min_wait_arr,
+            self.mean_wait_arr,
+            self.max_wait_arr,
+            self.utilization_arr,
+            self.num_workers_arr,
+        )
+        self.current_workers = int(self.num_workers_arr[-1])
+        completed_cumulative = np.cumsum(self.completed_arr)
+        self.total_completed = int(completed_cumulative[-1])
+        self.console.print(
+            "\n".join(
+                f"[green]Time: {self.timestamps[i].strftime('%H:%M:%S')} "
+                f"Queue: {self.in_queue_arr[i]} "
+                f"Processing: {self.in_progress_arr[i]} "
+                f"Completed: {completed_cumulative[i]}"
+                for i in range(0, self.params.duration, self.params.log_interval)
+            )
+        )
+        self.console.print(
+            f"[bold green]Simulation completed! Processed {self.message_counter} messages."
+        )
+        self._df = None  # Invalidate any view of a previous run
+        return self.df
+
+    def _format_log_event(self, event: tuple) -> str:
+        """Render one recorded log event into the line the loop used to print."""
+        if event[0] == "msg":
+            _, msg_id, wait = event
+            return (
+                f"[blue]Processing message {msg_id} "
+                f"(queue position {msg_id}, wait time {wait:.1f}s)"
+            )
+        _, i, queue_length, processing, completed = event
+        return (
+            f"[green]Time: {self.timestamps[i].strftime('%H:%M:%S')} "
+            f"Queue: {queue_length} "
+            f"Processing: {processing} "
+            f"Completed: {completed}"
+        )
+
     def run(self) -> pd.DataFrame:
         """Run the simulation for the specified duration with progress tracking"""
+        kernel_params = getattr(self.params.worker_scaling_func, "kernel_params", None)
+        if _NUMBA_AVAILABLE and kernel_params is not None:
+            return self._run_compiled(kernel_params())
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
@@ -103,94 +332,147 @@ class CelerySimulation:
             TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
             TimeElapsedColumn(),
         ) as progress:
-            task = progress.add_task("[cyan]Running simulation...", total=len(self.df))
+            duration = self.params.duration
+            task = progress.add_task("[cyan]Running simulation...", total=duration)
+            # Formatting and terminal redraws are pure overhead per tick, so
+            # the loop records raw event tuples that are formatted and
+            # flushed after the run, and the progress bar only advances
+            # every 256 ticks
+            log_events: list[tuple] = []
 
-            for i in range(len(self.df)):
-                current_time = self.df.iloc[i]["timestamp"]
+            # Hoist attribute chains into locals: LOAD_FAST beats repeated
+            # attribute lookups across tens of thousands of ticks
+            arrivals = self.arrivals
+            timestamps_epoch = self.timestamps_epoch
+            service_time = self.params.service_time
+            log_interval = self.params.log_interval
+            scaling_func = self.params.worker_scaling_func
+            queue_arrivals = self.queue_arrivals
+            queue_ids = self.queue_ids
+            in_queue_arr = self.in_queue_arr
+            in_progress_arr = self.in_progress_arr
+            completed_arr = self.completed_arr
+            min_wait_arr = self.min_wait_arr
+            mean_wait_arr = self.mean_wait_arr
+            max_wait_arr = self.max_wait_arr
+            utilization_arr = self.utilization_arr
+            num_workers_arr = self.num_workers_arr
+            n_inprog = self.in_progress_count
+            queue_head = self.queue_head
+            queue_tail = self.queue_tail
+            message_counter = self.message_counter
+            current_workers = self.current_workers
+            total_completed = self.total_completed
+            # Previous tick's wait stats: when the queue is untouched for a
+            # tick every queued message ages by exactly one second, so the
+            # stats are the old values + 1 without touching the array
+            prev_min_w = prev_mean_w = prev_max_w = 0.0
+
+            for i in range(duration):
+                now_s = int(timestamps_epoch[i])
 
                 # Update worker count based on current queue length and time
-                self._update_worker_count(len(self.message_queue), i)
+                current_workers = scaling_func(queue_tail - queue_head, i)
 
                 # Process completions
                 if i > 0:
-                    completions = int(len(self.in_progress) / self.params.service_time)
-                    self.in_progress = self.in_progress[completions:]
+                    completions = n_inprog // service_time
+                    n_inprog -= completions
+                    total_completed += completions
 
                 # Process new arrivals
-                new_arrivals = int(self.df.iloc[i]["arrivals"])
-                new_messages = [
-                    self._create_message(current_time) for _ in range(new_arrivals)
-                ]
+                new_arrivals = int(arrivals[i])
+                first_new_id = message_counter + 1
+                message_counter += new_arrivals
 
                 # Calculate available capacity using current worker count
-                available_capacity = self.current_workers - len(self.in_progress)
-
-                # Process queue first (FIFO order guaranteed by deque)
-                while available_capacity > 0 and self.message_queue:
-                    msg = (
-                        self.message_queue.popleft()
-                    )  # Always takes from front of queue
-                    wait_time = msg.wait_time(current_time)
-                    self.in_progress.append(msg)
-                    available_capacity -= 1
+                available_capacity = current_workers - n_inprog
 
+                # Process queue first (FIFO order guaranteed by the head cursor)
+                dispatched = min(max(available_capacity, 0), queue_tail - queue_head)
+                if dispatched:
                     # Log queue position and wait time for verification
-                    if i % self.params.log_interval == 0:
-                        self.console.print(
-                            f"[blue]Processing message {msg.id} "
-                            f"(queue position {msg.queue_position}, "
-                            f"wait time {wait_time:.1f}s)"
+                    if i % log_interval == 0:
+                        log_events.extend(
+                            ("msg", queue_ids[j], now_s - queue_arrivals[j])
+                            for j in range(queue_head, queue_head + dispatched)
                         )
+                    queue_head += dispatched
+                    n_inprog += dispatched
+                    available_capacity -= dispatched
 
                 # Process new arrivals (add to back of queue if no capacity)
-                for msg in new_messages:
-                    if available_capacity > 0:
-                        self.in_progress.append(msg)
-                        available_capacity -= 1
-                    else:
-                        self.message_queue.append(msg)  # Adds to back of queue
+                direct = min(max(available_capacity, 0), new_arrivals)
+                n_inprog += direct
+                queued = new_arrivals - direct
+                if queued:
+                    if queue_tail + queued > self._queue_capacity:
+                        self.queue_tail = queue_tail
+                        self._ensure_queue_capacity(queue_tail + queued)
+                        queue_arrivals = self.queue_arrivals
+                        queue_ids = self.queue_ids
+                    queue_arrivals[queue_tail : queue_tail + queued] = now_s
+                    queue_ids[queue_tail : queue_tail + queued] = np.arange(
+                        first_new_id + direct, first_new_id + new_arrivals
+                    )
+                    queue_tail += queued
 
                 # Calculate metrics
-                current_queue_length = len(self.message_queue)
+                current_queue_length = queue_tail - queue_head
 
-                # Calculate current wait times for all messages in queue
+                # Wait times for all queued messages in one vectorized pass,
+                # or a scalar +1 when nothing entered or left the queue
                 if current_queue_length > 0:
-                    current_wait_times = [
-                        msg.wait_time(current_time) for msg in self.message_queue
-                    ]
-                    self.df.at[i, "min_wait_time"] = min(current_wait_times)
-                    self.df.at[i, "mean_wait_time"] = sum(current_wait_times) / len(
-                        current_wait_times
-                    )
-                    self.df.at[i, "max_wait_time"] = max(current_wait_times)
+                    if dispatched or queued:
+                        waits = now_s - queue_arrivals[queue_head:queue_tail]
+                        prev_min_w = waits.min()
+                        prev_mean_w = waits.mean()
+                        prev_max_w = waits.max()
+                    else:
+                        prev_min_w += 1
+                        prev_mean_w += 1
+                        prev_max_w += 1
+                    min_wait_arr[i] = prev_min_w
+                    mean_wait_arr[i] = prev_mean_w
+                    max_wait_arr[i] = prev_max_w
                 else:
-                    self.df.at[i, "min_wait_time"] = 0
-                    self.df.at[i, "mean_wait_time"] = 0
-                    self.df.at[i, "max_wait_time"] = 0
-
-                # Update DataFrame
-                self.df.at[i, "in_queue"] = current_queue_length
-                self.df.at[i, "in_progress"] = len(self.in_progress)
-                self.df.at[i, "completed"] = completions if i > 0 else 0
-                self.df.at[i, "num_workers"] = self.current_workers
-                self.df.at[i, "utilization"] = (
-                    len(self.in_progress) / self.current_workers
-                )
+                    # The wait arrays are zero-initialized, so an empty
+                    # queue needs no writes — only the carried stats reset
+                    prev_min_w = prev_mean_w = prev_max_w = 0.0
+
+                # Record per-tick metrics
+                in_queue_arr[i] = current_queue_length
+                in_progress_arr[i] = n_inprog
+                completed_arr[i] = completions if i > 0 else 0
+                num_workers_arr[i] = current_workers
+                utilization_arr[i] = n_inprog / current_workers
 
                 # Log detailed metrics at intervals
-                if i % self.params.log_interval == 0:
-                    self.console.print(
-                        f"[green]Time: {current_time.strftime('%H:%M:%S')} "
-                        f"Queue: {len(self.message_queue)} "
-                        f"Processing: {len(self.in_progress)} "
-                        f"Completed: {self.df['completed'].sum()}"
+                if i % log_interval == 0:
+                    log_events.append(
+                        ("status", i, current_queue_length, n_inprog, total_completed)
                     )
 
-                progress.update(task, advance=1)
+                if (i & 255) == 255:
+                    progress.update(task, advance=256)
+
+            progress.update(task, completed=duration)
 
+            # Write loop-carried locals back to instance state
+            self.in_progress_count = n_inprog
+            self.queue_head = queue_head
+            self.queue_tail = queue_tail
+            self.message_counter = message_counter
+            self.current_workers = current_workers
+            self.total_completed = total_completed
+
+        self.log_events = log_events
+        if log_events:
+            self.console.print("\n".join(self._format_log_event(event) for event in log_events))
         self.console.print(
             f"[bold green]Simulation completed! Processed {self.message_counter} messages."
         )
+        self._df = None  # Invalidate any view of a previous run
         return self.df
 
     def get_summary_stats(self) -> dict:
@@ -201,10 +483,16 @@ class CelerySimulation:
             "mean_utilization": self.df["utilization"].mean(),
             "peak_utilization": self.df["utilization"].max(),
             "total_completed": self.df["completed"].sum(),
-            "mean_wait_time": self.df["queue_wait_time"].mean(),
-            "max_wait_time": self.df["queue_wait_time"].max(),
+            "mean_wait_time": self.df["mean_wait_time"].mean(),
+            "max_wait_time": self.df["max_wait_time"].max(),
         }
 
-    def plot_queue_dynamics(self) -> plt.Figure:
-        """Plot queue dynamics over time"""
-        return create_queue_dynamics_plot(self.df)
+    def plot_queue_dynamics(self, fig: "Figure | None" = None) -> "Figure":
+        """Plot queue dynamics over time, optionally into an existing figure"""
+        # Deferred: importing matplotlib costs hundreds of milliseconds
+        # and non-plotting runs (benchmarks, CI) never need it
+        from agent_smithers.latency_modelling.charts import (
+            create_queue_dynamics_plot,
+        )
+
+        return create_queue_dynamics_plot(self.df, fig=fig)
@@ -1,10 +1,19 @@
 """Notion API client implementation."""
 
+import asyncio
+import time
+from collections import OrderedDict
 from typing import Any
 
 from notion_client import AsyncClient, Client
 from pydantic import BaseModel
 
+# Pages are re-read constantly in an agent session; cache them by id
+_PAGE_CACHE_MAX_ENTRIES = 1024
+# Search results go stale quickly, so memoize them only briefly
+_SEARCH_CACHE_TTL_SECONDS = 60
+_SEARCH_CACHE_MAX_ENTRIES = 128
+
 
 class NotionClientConfig(BaseModel):
     """Configuration for the Notion client."""
@@ -25,20 +34,52 @@ class NotionClient:
         self.config = config
         self._client = Client(auth=config.auth_token)
         self._async_client = AsyncClient(auth=config.auth_token)
+        self._page_cache: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._search_cache: OrderedDict[str, tuple[float, list[dict[str, Any]]]] = (
+            OrderedDict()
+        )
 
-    def get_page(self, page_id: str) -> dict[str, Any]:
-        """Get a page by its ID.
+    def get_page(self, page_id: str, *, refresh: bool = False) -> dict[str, Any]:
+        """Get a page by its ID, served from the cache on repeat reads.
 
         Args:
             page_id: The ID of the page to retrieve.
+            refresh: Bypass the cache and re-fetch the page.
 
         Returns:
             The page data as a dictionary.
         """
-        return self._client.pages.retrieve(page_id)
+        if not refresh and page_id in self._page_cache:
+            self._page_cache.move_to_end(page_id)
+            return self._page_cache[page_id]
+        page = self._client.pages.retrieve(page_id)
+        self._cache_page(page_id, page)
+        return page
+
+    async def get_pages(self, page_ids: list[str]) -> list[dict[str, Any]]:
+        """Fetch several pages concurrently instead of one round-trip each.
+
+        Args:
+            page_ids: The IDs of the pages to retrieve.
+
+        Returns:
+            The pages in the same order as the requested IDs.
+        """
+        pages = await asyncio.gather(
+            *(self._async_client.pages.retrieve(page_id) for page_id in page_ids)
+        )
+        for page_id, page in zip(page_ids, pages, strict=True):
+            self._cache_page(page_id, page)
+        return list(pages)
+
+    def _cache_page(self, page_id: str, page: dict[str, Any]) -> None:
+        self._page_cache[page_id] = page
+        self._page_cache.move_to_end(page_id)
+        while len(self._page_cache) > _PAGE_CACHE_MAX_ENTRIES:
+            self._page_cache.popitem(last=False)
 
     def search_pages(self, query: str) -> list[dict[str, Any]]:
-        """Search for pages matching a query.
+        """Search for pages matching a query, memoized for a short TTL.
 
         Args:
             query: The search query.
@@ -46,5 +87,15 @@ class NotionClient:
         Returns:
             A list of matching pages.
         """
+        cached = self._search_cache.get(query)
+        if cached is not None:
+            cached_at, results = cached
+            if time.monotonic() - cached_at < _SEARCH_CACHE_TTL_SECONDS:
+                return results
+            del self._search_cache[query]
         response = self._client.search(query=query)
-        return response.get("results", [])
+        results = response.get("results", [])
+        self._search_cache[query] = (time.monotonic(), results)
+        while len(self._search_cache) > _SEARCH_CACHE_MAX_ENTRIES:
+            self._search_cache.popitem(last=False)
+        return results
@@ -11,7 +11,17 @@ def print_user(message: str):
     console.print(f"👤 [bold green]{message}[/]")
 
 
-def print_system(message: str):
+def _one_line(message: str) -> str:
     # ensure this is only 1 line
-    short_message = message.split("\n")[0][:400] + ("..." if len(message) > 400 else "")
-    console.print(f"⚙️ [bold red]{short_message}[/]")
+    return message.split("\n")[0][:400] + ("..." if len(message) > 400 else "")
+
+
+def print_system(message: str):
+    console.print(f"⚙️ [bold red]{_one_line(message)}[/]")
+
+
+def print_system_batch(messages: list[str]):
+    """Print several system messages with a single console write."""
+    if not messages:
+        return
+    console.print("\n".join(f"⚙️ [bold red]{_one_line(m)}[/]" for m in messages))
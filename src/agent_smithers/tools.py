@@ -1,11 +1,24 @@
-import base64
+import contextvars
 import datetime
+import functools
+import hashlib
+import operator
+import pickle
+import threading
+import time
+from collections import OrderedDict
 from io import BytesIO
+from pathlib import Path
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-import matplotlib.pyplot as plt
+import pandas as pd
 from anthropic.types import ToolUseBlock
 
+try:
+    from pybase64 import b64encode  # SIMD-accelerated drop-in replacement
+except ImportError:
+    from base64 import b64encode
+
 from agent_smithers import env
 from agent_smithers.github.client import GitHubClient, GitHubClientConfig
 from agent_smithers.latency_modelling.example import (
@@ -17,7 +30,8 @@ from agent_smithers.latency_modelling.simulation import (
     SimulationParams,
 )
 
-definitions = [
+# Immutable tool schema: built once, shared by every request untouched
+definitions = (
     {
         "name": "get_weather",
         "description": "Get the current weather in a given location",
@@ -77,7 +91,12 @@ definitions = [
         "description": "Get the latest simulation plot as a base64 encoded image",
         "input_schema": {
             "type": "object",
-            "properties": {},
+            "properties": {
+                "as_data_url": {
+                    "type": "boolean",
+                    "description": "Wrap the base64 PNG in a data: URL (default true)",
+                }
+            },
             "required": [],
         },
     },
@@ -135,34 +154,95 @@ definitions = [
             "properties": {},
         },
     },
-]
+)
 
-# Store latest simulation for plotting
-_latest_simulation = None
+# Simulations are stored per session so concurrent agent sessions sharing
+# this process don't clobber each other's "latest" result. Sessions that
+# never set the contextvar all share the default slot, preserving the old
+# single-process behavior.
+session_id_var: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "session_id", default="default"
+)
+# Each entry pairs the simulation with its scenario key: the tuple of
+# integer parameters it was run from, which also keys the PNG cache below
+_Scenario = tuple[int, int, int, int, int, int]
+_SIMULATIONS: OrderedDict[str, tuple[CelerySimulation, _Scenario]] = OrderedDict()
+_SIMULATIONS_LOCK = threading.Lock()
+_SIMULATIONS_MAX_ENTRIES = 32
+
+
+def _store_simulation(simulation: CelerySimulation, scenario: _Scenario) -> None:
+    with _SIMULATIONS_LOCK:
+        key = session_id_var.get()
+        _SIMULATIONS[key] = (simulation, scenario)
+        _SIMULATIONS.move_to_end(key)
+        while len(_SIMULATIONS) > _SIMULATIONS_MAX_ENTRIES:
+            _SIMULATIONS.popitem(last=False)
+
+
+def _current_simulation() -> tuple[CelerySimulation, _Scenario] | None:
+    with _SIMULATIONS_LOCK:
+        return _SIMULATIONS.get(session_id_var.get())
+
+# Rendered PNGs keyed by scenario, not by simulation identity: two
+# simulations run from the same parameters plot identically (traffic is
+# memoized per scenario), so a rebuilt simulation still hits the cache
+_PNG_CACHE: OrderedDict[_Scenario, str] = OrderedDict()
+_PNG_CACHE_MAX_ENTRIES = 16
+
+# One Figure reused (under lock) across every render: clearing and
+# redrawing axes is much cheaper than reconstructing a figure per call,
+# and a bare Figure never touches the pyplot registry, so there is
+# nothing to plt.close
+_plot_fig = None
+_PLOT_FIG_LOCK = threading.Lock()
+
+# Only memoize scenarios that are actually expensive to run; trivial ones
+# would just churn the cache
+_SIM_CACHE_COST_THRESHOLD = 1000
 
 def get_weather(*, location: str) -> str:
     return f"The weather in {location} is sunny."
 
-def simulate_celery_latency(
-    *,
-    num_workers: int,
-    service_time: int,
+@functools.lru_cache(maxsize=32)
+def _traffic(
     duration: int,
     base_rate: int,
     spike_rate: int,
-    worker_startup_delay: int = 20,
-) -> str:
-    global _latest_simulation
-
-    # Generate traffic pattern
-    traffic = generate_spiky_traffic(
+    spike_duration: int = 5,
+    spike_interval: int = 20,
+) -> pd.Series:
+    """Generate (and memoize) the spiky traffic series for a scenario.
+
+    Scenarios that differ only in worker parameters share the same
+    traffic, so the generator shouldn't rerun for each of them. The
+    series is never mutated downstream, making it safe to share.
+    """
+    return generate_spiky_traffic(
         duration_seconds=duration,
         base_rate=base_rate,
         spike_rate=spike_rate,
-        spike_duration=5,
-        spike_interval=20,
+        spike_duration=spike_duration,
+        spike_interval=spike_interval,
     )
 
+@functools.lru_cache(maxsize=64)
+def _run_sim(
+    num_workers: int,
+    service_time: int,
+    duration: int,
+    base_rate: int,
+    spike_rate: int,
+    worker_startup_delay: int,
+) -> CelerySimulation:
+    """Run one simulation scenario, memoized on its integer parameters.
+
+    The simulation is deterministic per cache entry, so repeat requests
+    for the same scenario return the finished object immediately.
+    """
+    # Generate traffic pattern
+    traffic = _traffic(duration, base_rate, spike_rate)
+
     # Configure simulation
     scaler = WorkerScaling(startup_delay=worker_startup_delay)
     params = SimulationParams(
@@ -175,7 +255,32 @@ def simulate_celery_latency(
     # Run simulation
     simulation = CelerySimulation(params, traffic)
     simulation.run()
-    _latest_simulation = simulation
+    return simulation
+
+def simulate_celery_latency(
+    *,
+    num_workers: int,
+    service_time: int,
+    duration: int,
+    base_rate: int,
+    spike_rate: int,
+    worker_startup_delay: int = 20,
+) -> str:
+    run = (
+        _run_sim
+        if duration * base_rate >= _SIM_CACHE_COST_THRESHOLD
+        else _run_sim.__wrapped__
+    )
+    scenario = (
+        num_workers,
+        service_time,
+        duration,
+        base_rate,
+        spike_rate,
+        worker_startup_delay,
+    )
+    simulation = run(*scenario)
+    _store_simulation(simulation, scenario)
 
     # Get summary stats
     stats = simulation.get_summary_stats()
@@ -189,114 +294,243 @@ def simulate_celery_latency(
     )
 
 
-def get_simulation_plot() -> str:
-    """Get the latest simulation plot as base64 encoded PNG"""
-    if _latest_simulation is None:
-        return "No simulation has been run yet"
-
-    # Create plot
-    fig = _latest_simulation.plot_queue_dynamics()
-
-    # Convert to base64
-    buffer = BytesIO()
-    fig.savefig(buffer, format="png")
-    plt.close(fig)
+def get_simulation_plot(*, as_data_url: bool = True) -> str:
+    """Get the latest simulation plot as base64 encoded PNG.
 
-    image_base64 = base64.b64encode(buffer.getvalue()).decode()
-    return f"data:image/png;base64,{image_base64}"
+    Consumers that already know the payload is a PNG (e.g. an image
+    content block, which wants bare base64) can pass as_data_url=False
+    and skip the data: URL wrapper and its 22-byte-per-use overhead.
+    """
+    entry = _current_simulation()
+    if entry is None:
+        return "No simulation has been run yet"
+    simulation, scenario = entry
+
+    # Any simulation of the same scenario skips the render entirely
+    with _SIMULATIONS_LOCK:
+        image_base64 = _PNG_CACHE.get(scenario)
+        if image_base64 is not None:
+            _PNG_CACHE.move_to_end(scenario)
+
+    if image_base64 is None:
+        # Deferred so importing this module (and every tool call that
+        # never plots) skips matplotlib's heavyweight import entirely;
+        # after the first call these resolve from sys.modules
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        global _plot_fig
+        with _PLOT_FIG_LOCK:
+            if _plot_fig is None:
+                _plot_fig = Figure(figsize=(12, 12))
+            # Redraw into the persistent figure rather than building a
+            # fresh one; plot_queue_dynamics clears it first
+            fig = simulation.plot_queue_dynamics(fig=_plot_fig)
+
+            # Rasterize through the Agg canvas directly; 80 dpi is plenty
+            # for an inline image and keeps the PNG encode cheap
+            buffer = BytesIO()
+            FigureCanvasAgg(fig).print_figure(buffer, format="png", dpi=80)
+
+        image_base64 = b64encode(buffer.getvalue()).decode()
+        with _SIMULATIONS_LOCK:
+            _PNG_CACHE[scenario] = image_base64
+            while len(_PNG_CACHE) > _PNG_CACHE_MAX_ENTRIES:
+                _PNG_CACHE.popitem(last=False)
+
+    if as_data_url:
+        return f"data:image/png;base64,{image_base64}"
+    return image_base64
+
+# Timezone resolution cache; None marks a name already known to be invalid
+_TZ_CACHE: dict[str, ZoneInfo | None] = {}
 
 def current_datetime(*, timezone: str | None = None) -> str:
     """Get current datetime, optionally in the specified timezone"""
-    try:
-        tz = ZoneInfo(timezone) if timezone else None
-    except ZoneInfoNotFoundError:
-        return f"Unknown timezone: {timezone}"
+    if timezone is None:
+        tz = None
+    elif timezone in _TZ_CACHE:
+        tz = _TZ_CACHE[timezone]
+        if tz is None:
+            return f"Unknown timezone: {timezone}"
+    else:
+        try:
+            tz = ZoneInfo(timezone)
+        except ZoneInfoNotFoundError:
+            _TZ_CACHE[timezone] = None
+            return f"Unknown timezone: {timezone}"
+        _TZ_CACHE[timezone] = tz
 
     dt = datetime.datetime.now(tz or datetime.UTC)
     return dt.isoformat()
 
-github_client = GitHubClient(
-    config=GitHubClientConfig(organization=env.GITHUB_ORGANIZATION)
+_TOOL_CACHE_DIR = Path.home() / ".cache" / "agent_smithers" / "tools"
+
+
+def _tool_cache(ttl: int):
+    """Persist tool responses on disk for `ttl` seconds.
+
+    Network tools are dominated by round-trip latency and rate limits;
+    repeat queries (very common in agent sessions) are served from a
+    pickle in the cache directory instead. Error responses are never
+    cached and any cache I/O failure falls through to the real call.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(**kwargs):
+            key = hashlib.sha256(
+                repr((fn.__name__, sorted(kwargs.items()))).encode()
+            ).hexdigest()
+            path = _TOOL_CACHE_DIR / f"{fn.__name__}-{key}.pickle"
+            try:
+                if path.exists() and time.time() - path.stat().st_mtime < ttl:
+                    return pickle.loads(path.read_bytes())
+            except (OSError, pickle.PickleError):
+                pass
+            result = fn(**kwargs)
+            if not result.startswith("Error"):
+                try:
+                    _TOOL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(pickle.dumps(result))
+                except OSError:
+                    pass
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+@functools.lru_cache(maxsize=1)
+def _get_github_client() -> GitHubClient:
+    """Build the GitHub client once, on first use rather than at import time."""
+    return GitHubClient(
+        config=GitHubClientConfig(organization=env.GITHUB_ORGANIZATION)
+    )
+
+
+# Result formatting: C-accelerated attribute extraction plus templates
+# bound once at import, so the per-result loops do no f-string parsing
+# and no repeated attribute lookups
+_SEARCH_REPO_ATTRS = operator.attrgetter(
+    "full_name", "description", "stargazers_count", "forks_count", "html_url"
 )
+_SEARCH_REPO_TEMPLATE = (
+    "- {}\n  Description: {}\n  Stars: {}, Forks: {}\n  URL: {}"
+).format
+_CODE_RESULT_FIELDS = operator.itemgetter("path", "url", "content")
+_CODE_RESULT_TEMPLATE = "File: {}\nURL: {}\n```\n{}\n```\n".format
+_LIST_REPO_ATTRS = operator.attrgetter("full_name", "description", "html_url")
+_LIST_REPO_TEMPLATE = "- {}\n  Description: {}\n  URL: {}".format
 
 
+@_tool_cache(ttl=300)
 def search_github(*, query: str) -> str:
     """Search GitHub repositories using the provided query"""
     try:
-        repos = github_client.search_repositories(query)
+        repos = _get_github_client().search_repositories(query)
 
         if not repos:
             return "No repositories found matching the query."
 
-        results = [
-            f"- {repo.full_name}\n"
-            f"  Description: {repo.description or 'No description'}\n"
-            f"  Stars: {repo.stargazers_count}, Forks: {repo.forks_count}\n"
-            f"  URL: {repo.html_url}"
-            for repo in repos[:5]  # Limit to top 5 results
-        ]
+        # Limit to top 5 results
+        rows = [_SEARCH_REPO_ATTRS(repo) for repo in repos[:5]]
+        results = "\n\n".join(
+            _SEARCH_REPO_TEMPLATE(name, desc or "No description", stars, forks, url)
+            for name, desc, stars, forks, url in rows
+        )
 
-        return "Top matching repositories:\n\n" + "\n\n".join(results)
+        return "Top matching repositories:\n\n" + results
     except Exception as e:
         return f"Error searching GitHub: {e!s}"
 
 
+@_tool_cache(ttl=300)
 def search_github_code(*, repository: str, query: str) -> str:
     """Search for code within a GitHub repository"""
     try:
-        results = github_client.search_code_in_repository(repository, query)
+        results = _get_github_client().search_code_in_repository(repository, query)
 
         if not results:
             return "No code matches found in the repository."
 
-        formatted_results = []
-        for result in results:
-            formatted_results.append(
-                f"File: {result['path']}\n"
-                f"URL: {result['url']}\n"
-                "```\n"
-                f"{result['content']}\n"
-                "```\n"
-            )
-
-        return "Matching code:\n\n" + "\n".join(formatted_results)
+        formatted = "\n".join(
+            _CODE_RESULT_TEMPLATE(*_CODE_RESULT_FIELDS(result)) for result in results
+        )
+
+        return "Matching code:\n\n" + formatted
     except Exception as e:
         return f"Error searching GitHub code: {e!s}"
 
 
+@_tool_cache(ttl=300)
 def list_github_repos() -> str:
     """List all GitHub repositories accessible"""
     try:
-        repos = github_client.list_accessible_repositories()
+        # Bounded listing so the client never paginates the whole org
+        repos = _get_github_client().list_accessible_repositories(limit=10)
 
         if not repos:
             return "No accessible repositories found."
 
-        results = [
-            f"- {repo.full_name}\n"
-            f"  Description: {repo.description or 'No description'}\n"
-            f"  URL: {repo.html_url}"
-            for repo in repos[:10]  # Limit to top 10 results
-        ]
+        rows = [_LIST_REPO_ATTRS(repo) for repo in repos]
+        results = "\n\n".join(
+            _LIST_REPO_TEMPLATE(name, desc or "No description", url)
+            for name, desc, url in rows
+        )
 
-        return "Accessible repositories:\n\n" + "\n\n".join(results)
+        return "Accessible repositories:\n\n" + results
     except Exception as e:
         return f"Error listing GitHub repositories: {e!s}"
 
-def executor(block: ToolUseBlock):
-    if block.name == "list_github_repos":
-        return list_github_repos(**block.input)
-    if block.name == "search_github_code":
-        return search_github_code(**block.input)
-    if block.name == "search_github":
-        return search_github(**block.input)
-    if block.name == "get_weather":
-        return get_weather(**block.input)
-    if block.name == "simulate_celery_latency":
-        return simulate_celery_latency(**block.input)
-    if block.name == "get_simulation_plot":
-        return get_simulation_plot()
-    if block.name == "current_datetime":
-        return current_datetime(**block.input)
-
+# Per-tool validators precomputed from the input schemas: the required
+# and allowed key sets are all these flat object schemas actually express,
+# so two frozenset operations reject a bad call before it ever dispatches
+_SCHEMA_KEYS = {
+    definition["name"]: (
+        frozenset(definition["input_schema"].get("required", ())),
+        frozenset(definition["input_schema"].get("properties", ())),
+    )
+    for definition in definitions
+}
+
+
+def _validate_input(name: str, payload: dict) -> str | None:
+    """Check a tool payload against its schema's key sets.
+
+    Returns an error message for the model, or None when valid.
+    """
+    required, allowed = _SCHEMA_KEYS[name]
+    missing = required - payload.keys()
+    if missing:
+        return f"Invalid input for {name}: missing {sorted(missing)}"
+    unknown = payload.keys() - allowed
+    if unknown:
+        return f"Invalid input for {name}: unexpected {sorted(unknown)}"
     return None
+
+
+# Tool routing: one dict lookup instead of a chain of string compares
+_DISPATCH = {
+    "get_weather": get_weather,
+    "simulate_celery_latency": simulate_celery_latency,
+    "get_simulation_plot": get_simulation_plot,
+    "current_datetime": current_datetime,
+    "search_github": search_github,
+    "search_github_code": search_github_code,
+    "list_github_repos": list_github_repos,
+}
+
+
+def executor(block: ToolUseBlock):
+    fn = _DISPATCH.get(block.name)
+    if fn is None:
+        return None
+    payload = block.input or {}
+    error = _validate_input(block.name, payload)
+    if error is not None:
+        return error
+    # An empty payload that passed validation means the tool needs no
+    # arguments for this call; skip the keyword-splat machinery entirely
+    return fn(**payload) if payload else fn()
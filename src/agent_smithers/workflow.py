@@ -1,86 +1,196 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
 from anthropic import Anthropic
 from anthropic.types import Message
-from printer import print_assistant, print_system, print_user
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
-from tools import definitions, executor
+
+from agent_smithers.printer import print_assistant, print_system, print_user
+from agent_smithers.tools import definitions, executor
+
+
+# Keep this many recent messages verbatim; older ones collapse into a
+# one-line-per-message summary so per-turn request size stays bounded
+_MAX_MESSAGES = 40
 
 
 class Workflow:
     def __init__(self, client: Anthropic, model: str = "claude-3-5-sonnet-20241022"):
         self.client = client
         self.model = model
-        self.messages: list[dict[str, Any]] = []
+        self.messages: deque[dict[str, Any]] = deque(maxlen=_MAX_MESSAGES)
+        self._dropped_summaries: list[str] = []
         self.console = Console()
+        # Tools run here while the response stream is still draining
+        self._tool_pool = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="workflow-tool"
+        )
+        self._pending_tools: dict[str, Future] = {}
+        # One dispatch table instead of chained type comparisons, and one
+        # pass over response.content instead of one per handler
+        self._content_handlers = {
+            "text": self._on_text,
+            "tool_use": self._on_tool_use,
+        }
+        self._run_tools = False
+        self._tool_response: dict[str, Any] | None = None
 
-    def send_message(self, content: str) -> None:
-        self.messages.append({"role": "user", "content": content})
-        print_user(content)
+    @staticmethod
+    def _is_tool_result(message: dict[str, Any]) -> bool:
+        content = message.get("content")
+        return (
+            isinstance(content, list)
+            and bool(content)
+            and isinstance(content[0], dict)
+            and content[0].get("type") == "tool_result"
+        )
+
+    @staticmethod
+    def _summarize_message(message: dict[str, Any]) -> str:
+        content = message["content"]
+        if isinstance(content, list):
+            content = " ".join(
+                getattr(part, "text", None) or str(part) for part in content
+            )
+        return f"{message['role']}: {str(content)[:120]}"
+
+    def _append_message(self, message: dict[str, Any]) -> None:
+        """Append to the rolling window, summarizing whatever falls off.
+
+        If dropping leaves an orphaned tool_result at the head (its
+        tool_use partner was just evicted), that message is folded into
+        the summary too so the history stays API-valid.
+        """
+        if len(self.messages) == self.messages.maxlen:
+            self._dropped_summaries.append(self._summarize_message(self.messages[0]))
+        self.messages.append(message)
+        while self.messages and self._is_tool_result(self.messages[0]):
+            self._dropped_summaries.append(
+                self._summarize_message(self.messages.popleft())
+            )
+
+    def _history(self) -> list[dict[str, Any]]:
+        """The message window, preceded by a summary of evicted turns."""
+        history = list(self.messages)
+        if self._dropped_summaries:
+            summary = "[Earlier conversation summary]\n" + "\n".join(
+                self._dropped_summaries
+            )
+            history.insert(0, {"role": "user", "content": summary})
+        return history
+
+    def _stream_response(self) -> Message:
+        """Stream one model turn, starting tools as soon as their block closes.
 
-        response = self.client.messages.create(
+        Tool execution overlaps with the remainder of the stream (and the
+        end-of-message handshake), so a tool turn costs roughly
+        max(stream, tool) instead of stream + tool.
+        """
+        with self.client.messages.stream(
             model=self.model,
             max_tokens=1024,
-            messages=self.messages,
+            messages=self._history(),
             tools=definitions,
-        )
+        ) as stream:
+            for event in stream:
+                if (
+                    event.type == "content_block_stop"
+                    and event.content_block.type == "tool_use"
+                ):
+                    block = event.content_block
+                    self._pending_tools[block.id] = self._tool_pool.submit(
+                        executor, block
+                    )
+            return stream.get_final_message()
+
+    def _discard_pending_tools(self) -> None:
+        """Drop futures for tool blocks this turn never answered.
+
+        Streaming submits every tool_use block speculatively, but only the
+        first block of a tool-stopped turn is consumed; cancel the rest so
+        unstarted tools never run and the table doesn't grow across turns.
+        """
+        for future in self._pending_tools.values():
+            future.cancel()
+        self._pending_tools.clear()
+
+    def send_message(self, content: str) -> None:
+        self._append_message({"role": "user", "content": content})
+        print_user(content)
 
-        self._handle_response(response)
+        try:
+            response = self._stream_response()
+
+            tool_response = self._handle_response(response)
 
-        if response.stop_reason == "tool_use":
-            tool_response = self._handle_tool_calls(response)
             if tool_response:
-                self.messages.append(tool_response)
+                self._append_message(tool_response)
                 # Get final response after tool use
-                final_response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=1024,
-                    messages=self.messages,
-                    tools=definitions,
-                )
+                final_response = self._stream_response()
                 self._handle_response(final_response)
+        finally:
+            self._discard_pending_tools()
 
-    def _handle_response(self, response: Message) -> None:
+    def _handle_response(self, response: Message) -> dict[str, Any] | None:
+        """Record the turn and dispatch every content block in one pass."""
         message_content = {"role": response.role, "content": response.content}
-        self.messages.append(message_content)
+        self._append_message(message_content)
 
+        self._run_tools = response.stop_reason == "tool_use"
+        self._tool_response = None
+        handlers = self._content_handlers
         for content in response.content:
-            if content.type == "text":
-                print_assistant(content.text)
+            handler = handlers.get(content.type)
+            if handler is not None:
+                handler(content)
+        return self._tool_response
 
-    def _handle_tool_calls(self, response: Message) -> dict[str, Any] | None:
-        for content in response.content:
-            if content.type == "tool_use":
-                tool_use_id = content.id
-                print_system(f"Using tool: {content.name}")
-                tool_response = executor(content)
-                print_system(f"Tool response: {tool_response}")
-
-                return {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": tool_use_id,
-                            "content": str(tool_response),
-                        }
-                    ],
+    def _on_text(self, content) -> None:
+        print_assistant(content.text)
+
+    def _on_tool_use(self, content) -> None:
+        # Only the first tool_use of a tool-stopped turn is answered
+        if not self._run_tools or self._tool_response is not None:
+            return
+        tool_use_id = content.id
+        print_system(f"Using tool: {content.name}")
+        future = self._pending_tools.pop(tool_use_id, None)
+        tool_response = future.result() if future else executor(content)
+        print_system(f"Tool response: {tool_response}")
+
+        self._tool_response = {
+            "role": "user",
+            "content": [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": tool_use_id,
+                    "content": str(tool_response),
                 }
-        return None
+            ],
+        }
 
     def print_conversation(self) -> None:
+        panels = []
         for message in self.messages:
             role = message["role"]
             content = message["content"]
 
             if isinstance(content, list):
-                content = "\n".join(c.text for c in content if hasattr(c, "text"))
+                content = "\n".join(
+                    text for c in content if (text := getattr(c, "text", None))
+                )
             if content:
-                panel = Panel(
-                    str(content),
-                    title=role.upper(),
-                    title_align="left",
-                    border_style="blue" if role == "assistant" else "green",
+                panels.append(
+                    Panel(
+                        str(content),
+                        title=role.upper(),
+                        title_align="left",
+                        border_style="blue" if role == "assistant" else "green",
+                    )
                 )
-                self.console.print(panel)
+        # One render pass and one write for the whole conversation instead
+        # of a styled print per panel
+        if panels:
+            self.console.print(Group(*panels))
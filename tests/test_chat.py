@@ -0,0 +1,79 @@
+"""Tests for the console chat session's history compression."""
+
+from agent_smithers.console.chat import ChatSession
+
+
+def _session() -> ChatSession:
+    return ChatSession(api_key="test-key")
+
+
+def _tool_exchange(tool_use_id: str, payload: str) -> list[dict]:
+    """One assistant tool_use message and its paired tool_result message."""
+    return [
+        {
+            "role": "assistant",
+            "content": [
+                {
+                    "type": "tool_use",
+                    "id": tool_use_id,
+                    "name": "get_weather",
+                    "input": {"location": "Berlin"},
+                }
+            ],
+        },
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": tool_use_id,
+                    "content": payload,
+                }
+            ],
+        },
+    ]
+
+
+def test_compress_keeps_every_tool_use_paired():
+    """With keep_last=0 (the oversized-prompt retry) every tool_use must
+    still have a matching tool_result block in the following message."""
+    session = _session()
+    messages = [{"role": "user", "content": "hi"}]
+    for i in range(3):
+        messages += _tool_exchange(f"tool-{i}", "x" * 500)
+
+    compressed = session._compress_tool_results(messages, keep_last=0)
+
+    for i, message in enumerate(compressed):
+        content = message["content"]
+        if not isinstance(content, list):
+            continue
+        for block in content:
+            if block.get("type") != "tool_use":
+                continue
+            next_content = compressed[i + 1]["content"]
+            assert any(
+                partner.get("type") == "tool_result"
+                and partner.get("tool_use_id") == block["id"]
+                for partner in next_content
+            )
+
+
+def test_compress_summarizes_old_results_and_keeps_recent_verbatim():
+    session = _session()
+    messages = [{"role": "user", "content": "hi"}]
+    for i in range(3):
+        messages += _tool_exchange(f"tool-{i}", "x" * 500)
+
+    compressed = session._compress_tool_results(messages, keep_last=2)
+
+    # Oldest result is collapsed to a one-line summary naming the tool
+    oldest = compressed[2]["content"][0]
+    assert oldest["type"] == "tool_result"
+    assert oldest["tool_use_id"] == "tool-0"
+    assert oldest["content"].startswith("[get_weather] OK (500 chars)")
+    assert len(oldest["content"]) < 500
+
+    # The last two results are untouched
+    assert compressed[4]["content"][0]["content"] == "x" * 500
+    assert compressed[6]["content"][0]["content"] == "x" * 500
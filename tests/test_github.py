@@ -93,3 +93,89 @@ def test_search_code_in_repository(mock_github_client):
     mock_github_client.search_code.assert_called_once_with(
         "def repo:test-org/test-repo"
     )
+
+
+def test_search_code_in_repository_limits_results(mock_github_client):
+    """Test that only the top 5 code results are decoded and returned."""
+    mock_contents = []
+    for i in range(8):
+        mock_content = MagicMock(spec=ContentFile.ContentFile)
+        mock_content.repository.full_name = "test-org/test-repo"
+        mock_content.path = f"src/file{i}.py"
+        mock_content.html_url = (
+            f"https://github.com/test-org/test-repo/blob/main/src/file{i}.py"
+        )
+        mock_content.decoded_content = b"pass"
+        mock_contents.append(mock_content)
+
+    mock_github_client.search_code.return_value = iter(mock_contents)
+
+    client = GitHubClient(GitHubClientConfig(organization="test-org"))
+    results = client.search_code_in_repository("test-repo", "pass")
+
+    assert len(results) == 5
+    assert results[-1]["path"] == "src/file4.py"
+
+
+def test_search_code_in_repository_is_cached(mock_github_client):
+    """Test that repeat code searches are served from the cache."""
+    mock_content = MagicMock(spec=ContentFile.ContentFile)
+    mock_content.repository.full_name = "test-org/test-repo"
+    mock_content.path = "src/test.py"
+    mock_content.html_url = "https://github.com/test-org/test-repo/blob/main/src/test.py"
+    mock_content.decoded_content = b"def test_function():\n    pass"
+
+    mock_github_client.search_code.return_value = [mock_content]
+
+    client = GitHubClient(GitHubClientConfig(organization="test-org"))
+    first = client.search_code_in_repository("test-repo", "def")
+    second = client.search_code_in_repository("test-repo", "def")
+
+    assert first == second
+    mock_github_client.search_code.assert_called_once()
+
+
+def test_blob_decoding_is_cached_by_sha(mock_github_client):
+    """Test that a blob seen under a new query is not fetched again."""
+    mock_content = MagicMock(spec=ContentFile.ContentFile)
+    mock_content.repository.full_name = "test-org/test-repo"
+    mock_content.path = "src/test.py"
+    mock_content.html_url = "https://github.com/test-org/test-repo/blob/main/src/test.py"
+    mock_content.sha = "abc123"
+    mock_content.decoded_content = b"original"
+
+    mock_github_client.search_code.return_value = [mock_content]
+
+    client = GitHubClient(GitHubClientConfig(organization="test-org"))
+    first = client.search_code_in_repository("test-repo", "one")
+
+    # A different query misses the search cache but hits the blob cache
+    mock_content.decoded_content = b"changed"
+    second = client.search_code_in_repository("test-repo", "two")
+
+    assert first[0]["content"] == "original"
+    assert second[0]["content"] == "original"
+
+
+def test_list_accessible_repositories_applies_limit(mock_github_client):
+    """Test that repository listing stops at the requested limit."""
+    mock_repos = [MagicMock(spec=Repository.Repository) for _ in range(5)]
+    mock_org = mock_github_client.get_organization.return_value
+    mock_org.get_repos.return_value = iter(mock_repos)
+
+    client = GitHubClient(GitHubClientConfig(organization="test-org"))
+    results = client.list_accessible_repositories(limit=3)
+
+    assert len(results) == 3
+    mock_org.get_repos.assert_called_once_with(sort="updated")
+
+
+def test_get_repository_is_memoized(mock_github_client):
+    """Test that repeat repository lookups hit the API only once."""
+    mock_repo = MagicMock(spec=Repository.Repository)
+    mock_org = mock_github_client.get_organization.return_value
+    mock_org.get_repo.return_value = mock_repo
+
+    client = GitHubClient(GitHubClientConfig(organization="test-org"))
+    assert client.get_repository("test-repo") is client.get_repository("test-repo")
+    mock_org.get_repo.assert_called_once_with("test-repo")
@@ -1,6 +1,7 @@
 """Tests for the Notion API integration."""
 
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -50,3 +51,58 @@ def test_search_pages(mock_notion_client):
 
     assert results == expected_results
     mock_notion_client.search.assert_called_once_with(query="test query")
+
+
+def test_get_page_is_cached(mock_notion_client):
+    """Test that repeat page reads are served from the cache."""
+    expected_page = {"id": "test-page-id", "title": "Test Page"}
+    mock_notion_client.pages.retrieve.return_value = expected_page
+
+    client = NotionClient(NotionClientConfig(auth_token="test-token"))
+    first = client.get_page("test-page-id")
+    second = client.get_page("test-page-id")
+
+    assert first == second
+    mock_notion_client.pages.retrieve.assert_called_once_with("test-page-id")
+
+
+def test_get_page_refresh_bypasses_cache(mock_notion_client):
+    """Test that refresh=True re-fetches the page."""
+    mock_notion_client.pages.retrieve.return_value = {"id": "test-page-id"}
+
+    client = NotionClient(NotionClientConfig(auth_token="test-token"))
+    client.get_page("test-page-id")
+    client.get_page("test-page-id", refresh=True)
+
+    assert mock_notion_client.pages.retrieve.call_count == 2
+
+
+def test_search_pages_is_memoized(mock_notion_client):
+    """Test that repeat searches within the TTL hit the cache."""
+    expected_results = [{"id": "page-1", "title": "Page 1"}]
+    mock_notion_client.search.return_value = {"results": expected_results}
+
+    client = NotionClient(NotionClientConfig(auth_token="test-token"))
+    first = client.search_pages("test query")
+    second = client.search_pages("test query")
+
+    assert first == second == expected_results
+    mock_notion_client.search.assert_called_once_with(query="test query")
+
+
+def test_get_pages_fetches_concurrently():
+    """Test that get_pages retrieves all pages via the async client."""
+    expected_pages = [{"id": "page-1"}, {"id": "page-2"}]
+    with (
+        patch("agent_smithers.notion.client.Client"),
+        patch("agent_smithers.notion.client.AsyncClient") as mock_async_client,
+    ):
+        mock_instance = MagicMock()
+        mock_instance.pages.retrieve = AsyncMock(side_effect=expected_pages)
+        mock_async_client.return_value = mock_instance
+
+        client = NotionClient(NotionClientConfig(auth_token="test-token"))
+        pages = asyncio.run(client.get_pages(["page-1", "page-2"]))
+
+    assert pages == expected_pages
+    assert mock_instance.pages.retrieve.call_count == 2